@@ -0,0 +1,127 @@
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+
+from lepi_http import HTTP_CACHE_EXPIRE_AFTER
+
+
+COVERAGE_PATH = "lepi_coverage.json"
+# A recorded miss is trusted for as long as a cached page, then the source is queried again
+COVERAGE_MISS_TTL = HTTP_CACHE_EXPIRE_AFTER.total_seconds()
+
+logger = logging.getLogger("lepi")
+
+
+class CoverageIndex:
+    """
+    Thread-safe record, persisted as JSON, of the sources known to have no description of a taxon.
+
+    Most sources only cover a region (UKMoths the UK, BAMONA North America, NRM and Artfakta
+    Sweden), so most taxa miss on several of them. A source is recorded as a miss only when
+    it answered definitely (no page, or a page without the description); failed requests
+    are not recorded, so they are retried on the next run. Later runs skip the recorded
+    misses until they are older than `miss_ttl`, so a temporary problem (a bot-challenge
+    page, a layout change...) is not skipped for good.
+
+    Set `enabled` to False to query every source without reading or updating the index, or
+    call reset() to forget every recorded miss.
+
+    Args:
+        path (str): JSON file the index is read from and saved to.
+        enabled (bool): Whether the index is used at all.
+        miss_ttl (float): Seconds after which a recorded miss is queried again.
+    """
+
+    def __init__(self, path: str, enabled: bool = True, miss_ttl: float = COVERAGE_MISS_TTL) -> None:
+        self.path = path
+        self.enabled = enabled
+        self.miss_ttl = miss_ttl
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._save_registered = False
+        # { name: { source: time the miss was recorded } }
+        self._misses: dict[str, dict[str, float]] = {}
+        try:
+            with open(path, encoding="utf-8") as f:
+                self._misses = {
+                    name: dict(sources) for name, sources in json.load(f).items() if isinstance(sources, dict)
+                }
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.warning("Could not read the coverage index %s: %s", path, e)
+
+    def misses_for(self, name: str) -> set[str]:
+        """
+        Returns the sources known to have no description for `name`, ignoring expired misses.
+        """
+        if not self.enabled:
+            return set()
+        oldest = time.time() - self.miss_ttl
+        with self._lock:
+            return {source for source, recorded in self._misses.get(name, {}).items() if recorded >= oldest}
+
+    def record(self, name: str, missed: set[str], found: set[str]) -> None:
+        """
+        Updates the misses of `name` with the outcome of the sources that answered.
+
+        Args:
+            name (str): Name of the taxon.
+            missed (set[str]): Sources that definitely have no description for it.
+            found (set[str]): Sources that returned a description for it.
+        """
+        if not self.enabled:
+            return
+        now = time.time()
+        with self._lock:
+            misses = self._misses.get(name, {})
+            updated = {source: recorded for source, recorded in misses.items() if source not in found}
+            updated.update(dict.fromkeys(missed, now))
+            if updated == misses:
+                return
+            if updated:
+                self._misses[name] = updated
+            else:
+                del self._misses[name]
+            self._dirty = True
+            if not self._save_registered:
+                # Registered on first change, i.e. after the entry points have configured
+                # logging, so it runs before the logging listener is stopped at exit
+                atexit.register(self.save)
+                self._save_registered = True
+
+    def reset(self) -> None:
+        """
+        Forgets every recorded miss and deletes the index file.
+        """
+        with self._lock:
+            self._misses.clear()
+            self._dirty = False
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def save(self) -> None:
+        """
+        Writes the index to disk if it changed since it was loaded or last saved.
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {name: dict(sources) for name, sources in self._misses.items()}
+            self._dirty = False
+        # Write to a temporary file first so an interrupted save never truncates the index
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning("Could not write the coverage index to %s: %s", self.path, e)
+
+
+SPECIES_COVERAGE = CoverageIndex(COVERAGE_PATH)
@@ -0,0 +1,119 @@
+import logging
+import os
+import pickle
+import sys
+import tempfile
+
+import pandas as pd
+
+
+DYNTAXA_PATH = "../dyntaxa_DB/Taxon.csv"
+DYNTAXA_INDEX_CACHE = "../dyntaxa_DB/taxon_index.pickle"
+DYNTAXA_COLUMNS = ["scientificName", "taxonRank", "acceptedNameUsageID"]
+CHUNK_SIZE = 200_000
+
+logger = logging.getLogger("lepi")
+
+
+def load_id_index(path: str) -> dict[tuple[str, str | None], str | None]:
+    """
+    Reads the Dyntaxa taxon table and builds a lookup of Artfakta taxon IDs.
+
+    Only the three columns needed for the lookup are parsed, in chunks of CHUNK_SIZE rows
+    so peak memory stays bounded however large the table is. Every row is indexed twice:
+    by (name, rank) and by (name, None) for rank-agnostic lookups. As with the previous
+    DataFrame filter, the first row for a key wins.
+
+    Args:
+        path (str): Path to the tab-separated Dyntaxa Taxon.csv file.
+
+    Returns:
+        dict: { (normalized_name, normalized_rank | None): taxon_id | None }
+    """
+    chunks = pd.read_csv(
+        path, sep="\t", usecols=DYNTAXA_COLUMNS, dtype="string", encoding="utf-8", chunksize=CHUNK_SIZE
+    )
+
+    id_index = {}
+    for df in chunks:
+        # Normalize whole columns at once instead of row by row
+        names = df["scientificName"].str.strip().str.lower()
+        ranks = df["taxonRank"].str.strip().str.lower()
+        taxon_ids = df["acceptedNameUsageID"].str.split(":").str[-1]  # extract the number part
+        for name, rank, taxon_id in zip(names, ranks, taxon_ids):
+            if not isinstance(name, str):
+                continue
+            if not isinstance(taxon_id, str):
+                taxon_id = None
+            if isinstance(rank, str):
+                # Only a handful of distinct ranks exist; intern them so the keys share one string
+                id_index.setdefault((name, sys.intern(rank)), taxon_id)
+            id_index.setdefault((name, None), taxon_id)
+    return id_index
+
+
+def load_cached_id_index(path: str, cache_path: str) -> dict[tuple[str, str | None], str | None]:
+    """
+    Returns the taxon ID index, reusing a pickled copy when it is newer than the CSV.
+
+    Parsing the Dyntaxa CSV takes seconds, while unpickling the finished index is a single
+    binary read, so the CSV is only parsed on the first run or after it changes.
+
+    Args:
+        path (str): Path to the tab-separated Dyntaxa Taxon.csv file.
+        cache_path (str): Where the pickled index is read from / written to.
+
+    Returns:
+        dict: { (normalized_name, normalized_rank | None): taxon_id | None }
+    """
+    if os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(path):
+        try:
+            with open(cache_path, "rb") as f:
+                return pickle.load(f)
+        except Exception as e:
+            # A corrupt or foreign cache (truncated file, newer pickle protocol, missing
+            # classes...) is just a miss: rebuild it from the CSV below
+            logger.warning("Ignoring unreadable taxon index cache %s: %s", cache_path, e)
+
+    id_index = load_id_index(path)
+    # Write to a temporary file next to the cache and swap it in, so an interrupted write
+    # never leaves a truncated cache behind
+    tmp_fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(cache_path) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(tmp_fd, "wb") as f:
+            pickle.dump(id_index, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        logger.warning("Could not write the taxon index cache to %s: %s", cache_path, e)
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return id_index
+
+
+try:
+    _ID_INDEX = load_cached_id_index(DYNTAXA_PATH, DYNTAXA_INDEX_CACHE)
+except FileNotFoundError:
+    logger.warning("File not found. Please check the path to the dataset for the taxon id generation.")
+    _ID_INDEX = {}
+
+
+def has_taxon_index() -> bool:
+    """
+    Returns whether the Dyntaxa index was loaded, i.e. whether a None from get_taxon_id means
+    the name is unknown rather than that the dataset is missing.
+    """
+    return bool(_ID_INDEX)
+
+
+def get_taxon_id(name: str, rank: str | None = None) -> str | None:
+    """
+    Given a scientific name, return the numeric Artfakta taxon ID from the Dyntaxa dataset.
+
+    Args:
+        name (str): Scientific name (e.g., 'Elymus caninus')
+        rank (str | None): Taxonomic rank to match (e.g. 'genus'), or None to match any rank.
+
+    Returns:
+        str | None: Taxon ID number (e.g. '222441') or None if not found
+    """
+    return _ID_INDEX.get((name.strip().lower(), rank))
@@ -0,0 +1,250 @@
+import atexit
+from collections.abc import Iterator
+from contextlib import contextmanager
+import threading
+import time
+from datetime import timedelta
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+
+try:
+    import requests_cache
+except ImportError:
+    requests_cache = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+MAX_CONNECTIONS_PER_HOST = 4
+MAX_RETRIES = 3
+# (connect, read) seconds: unreachable hosts fail fast, slow pages still get time to arrive
+REQUEST_TIMEOUT = (3.05, 8)
+BACKOFF_FACTOR = 0.5
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+MAX_POOLED_HOSTS = 20
+MAX_PAGE_BYTES = 2_000_000
+CHUNK_BYTES = 64 * 1024
+HTTP_CACHE_PATH = "lepi_cache.sqlite"
+HTTP_CACHE_EXPIRE_AFTER = timedelta(days=7)
+
+
+def _is_cacheable_size(response: requests.Response) -> bool:
+    """
+    Tells requests-cache not to store responses declaring a body larger than MAX_PAGE_BYTES.
+
+    Caching a response reads its whole body, which would defeat the size cap of
+    http_get_content; rejected responses are left unread and streamed as usual.
+
+    Args:
+        response (requests.Response): Response about to be cached.
+
+    Returns:
+        bool: False if the Content-Length header exceeds MAX_PAGE_BYTES.
+    """
+    content_length = response.headers.get("Content-Length", "")
+    return not content_length.isdigit() or int(content_length) <= MAX_PAGE_BYTES
+
+
+# A single session keeps TCP/TLS connections alive between requests to the same host.
+# requests.Session is safe to share between threads for plain GET requests.
+# When requests-cache is installed, successful pages are also kept on disk so re-runs
+# skip the network. The authenticated Artfakta API is never cached.
+if requests_cache is not None:
+    SESSION = requests_cache.CachedSession(
+        HTTP_CACHE_PATH,
+        backend="sqlite",
+        expire_after=HTTP_CACHE_EXPIRE_AFTER,
+        allowable_codes=(200,),
+        allowable_methods=("GET",),
+        urls_expire_after={"api.artdatabanken.se": requests_cache.DO_NOT_CACHE},
+        filter_fn=_is_cacheable_size,
+    )
+else:
+    SESSION = requests.Session()
+# Keep one idle connection per allowed in-flight request, so with the per-host semaphore
+# every request finds a warm keep-alive connection and none is ever opened and dropped.
+# Network errors and throttling/server errors are retried by urllib3 with exponential
+# backoff (honouring Retry-After on 429/503); once retries run out the last response is
+# returned so raise_for_status() reports it as usual.
+_retry = Retry(
+    total=MAX_RETRIES - 1,
+    connect=MAX_RETRIES - 1,
+    # A read timeout already cost a full REQUEST_TIMEOUT wait, so it is retried only once
+    read=1,
+    backoff_factor=BACKOFF_FACTOR,
+    status_forcelist=RETRY_STATUS_CODES,
+    allowed_methods=frozenset(["GET"]),
+    raise_on_status=False,
+)
+_adapter = HTTPAdapter(pool_connections=MAX_POOLED_HOSTS, pool_maxsize=MAX_CONNECTIONS_PER_HOST, max_retries=_retry)
+SESSION.mount("https://", _adapter)
+SESSION.mount("http://", _adapter)
+# The default Accept-Encoding of requests already includes 'br' when the optional brotli
+# package is installed, and bodies are handed to the parsers as raw bytes.
+SESSION.headers.update({"User-Agent": "lepi-scrapper/1.0"})
+atexit.register(SESSION.close)
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket that spaces out requests sent to a single host.
+
+    Args:
+        rate (float): Tokens added per second (sustained requests per second).
+        capacity (int): Maximum burst size.
+    """
+
+    def __init__(self, rate: float, capacity: int = 1) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """
+        Blocks until a token is available and consumes it.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # Reserve the token right away so concurrent callers queue up behind us
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+
+
+# Hosts that throttle or ban aggressive clients get an explicit request rate
+RATE_LIMITERS = {
+    "api.artdatabanken.se": RateLimiter(rate=2, capacity=2),
+    "www.butterfliesandmoths.org": RateLimiter(rate=2, capacity=2),
+    "www2.nrm.se": RateLimiter(rate=2, capacity=2),
+}
+
+_host_semaphores: dict[str, threading.BoundedSemaphore] = {}
+_host_semaphores_lock = threading.Lock()
+
+
+def _host_semaphore(host: str) -> threading.BoundedSemaphore:
+    """
+    Returns the semaphore bounding the in-flight requests to `host`.
+    """
+    with _host_semaphores_lock:
+        if host not in _host_semaphores:
+            _host_semaphores[host] = threading.BoundedSemaphore(MAX_CONNECTIONS_PER_HOST)
+        return _host_semaphores[host]
+
+
+@contextmanager
+def _host_slot(url: str) -> Iterator[None]:
+    """
+    Holds one of the per-host request slots of `url`, waiting for its rate limiter if any.
+
+    Args:
+        url (str): URL about to be fetched.
+    """
+    host = urlsplit(url).netloc
+    limiter = RATE_LIMITERS.get(host)
+    with _host_semaphore(host):
+        if limiter is not None:
+            limiter.acquire()
+        yield
+
+
+def http_get(url: str, **kwargs) -> requests.Response:
+    """
+    Sends a GET request through the shared session with bounded per-host concurrency.
+
+    Failed attempts are retried with exponential backoff by the session's adapter.
+
+    Args:
+        url (str): URL to fetch.
+        **kwargs: Extra arguments forwarded to `SESSION.get` (e.g. headers). `timeout`
+            defaults to REQUEST_TIMEOUT.
+
+    Returns:
+        requests.Response: The successful response.
+
+    Raises:
+        requests.RequestException: If the request fails with a non-retryable error
+            or still fails after MAX_RETRIES attempts.
+    """
+    kwargs.setdefault("timeout", REQUEST_TIMEOUT)
+    with _host_slot(url):
+        response = SESSION.get(url, **kwargs)
+        try:
+            response.raise_for_status()
+        except requests.HTTPError:
+            response.close()
+            raise
+        return response
+
+
+def http_get_content(url: str, max_bytes: int = MAX_PAGE_BYTES, **kwargs) -> bytes:
+    """
+    Downloads the body of a page as raw bytes, stopping once `max_bytes` have been read.
+
+    The body is streamed, so an unexpectedly large page never has to be held in memory in
+    full, and it is kept as bytes so the HTML parser can decode it directly. The host slot
+    is held until the body has been read, so the per-host cap also bounds downloads.
+
+    With requests-cache installed, responses that are cached are read in full first, so the
+    cap only bounds pages that declare a Content-Length above MAX_PAGE_BYTES (which are
+    never cached); a response without Content-Length is downloaded and cached in full.
+
+    Args:
+        url (str): URL to fetch.
+        max_bytes (int): Maximum number of bytes to read from the body.
+        **kwargs: Extra arguments forwarded to `SESSION.get` (e.g. headers). `timeout`
+            defaults to REQUEST_TIMEOUT.
+
+    Returns:
+        bytes: The (possibly truncated) body of the response.
+
+    Raises:
+        requests.RequestException: If the request fails (see `http_get`).
+    """
+    kwargs.setdefault("timeout", REQUEST_TIMEOUT)
+    with _host_slot(url):
+        response = SESSION.get(url, stream=True, **kwargs)
+        try:
+            response.raise_for_status()
+            chunks = []
+            size = 0
+            for chunk in response.iter_content(chunk_size=CHUNK_BYTES):
+                chunks.append(chunk)
+                size += len(chunk)
+                if size >= max_bytes:
+                    break
+            return b"".join(chunks)[:max_bytes]
+        finally:
+            response.close()
+
+
+def response_json(response: requests.Response):
+    """
+    Decodes a JSON response, using orjson straight from the raw bytes when it is installed.
+
+    Args:
+        response (requests.Response): Response with a JSON body.
+
+    Returns:
+        The decoded JSON document.
+
+    Raises:
+        requests.exceptions.InvalidJSONError: If the body is not valid JSON.
+    """
+    if orjson is None:
+        return response.json()
+    try:
+        return orjson.loads(response.content)
+    except orjson.JSONDecodeError as e:
+        raise requests.exceptions.InvalidJSONError(str(e), response=response) from e
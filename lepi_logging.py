@@ -0,0 +1,34 @@
+import atexit
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+
+LOG_FORMAT = "%(message)s"
+
+
+def setup_logging(level: int = logging.INFO) -> QueueListener:
+    """
+    Sends log records to stderr from a background thread instead of the logging threads.
+
+    Fetcher threads only put records on a queue, so they never block on console writes or
+    on the lock of the stream handler. The listener is stopped, flushing any queued
+    records, when the interpreter exits.
+
+    Args:
+        level (int): Minimum level of the records that are written.
+
+    Returns:
+        QueueListener: The started listener.
+    """
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, handler)
+    listener.start()
+    atexit.register(listener.stop)
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(QueueHandler(log_queue))
+    return listener
@@ -0,0 +1,41 @@
+import re
+from bs4 import BeautifulSoup, SoupStrainer
+
+
+HTML_PARSER = "lxml"
+
+
+def make_soup(html: bytes, parse_only: SoupStrainer | None = None) -> BeautifulSoup:
+    """
+    Builds the BeautifulSoup tree of a page with the C-based lxml parser.
+
+    Raw bytes are passed straight through so the page is decoded only once, by the parser,
+    using the charset declared in the document.
+
+    Args:
+        html (bytes): Raw HTML of the page.
+        parse_only (SoupStrainer | None): If given, only the matching elements and their
+            contents are turned into tree nodes; the rest of the page is skipped.
+
+    Returns:
+        BeautifulSoup: Parsed document.
+    """
+    return BeautifulSoup(html, HTML_PARSER, parse_only=parse_only)
+
+
+def class_strainer(tag: str, css_class: str) -> SoupStrainer:
+    """
+    Builds a SoupStrainer keeping the `tag` elements that have `css_class` among their classes.
+
+    While a page is being parsed the strainer sees the raw 'class' attribute string
+    (e.g. 'span7 speciestext'), so a plain class_='speciestext' would not match; the class
+    is matched as a whitespace-separated token instead.
+
+    Args:
+        tag (str): Tag name, e.g. 'div'.
+        css_class (str): One of the classes of the element, e.g. 'speciestext'.
+
+    Returns:
+        SoupStrainer: Strainer to pass as `parse_only` to make_soup.
+    """
+    return SoupStrainer(tag, class_=re.compile(rf"(?:^|\s){re.escape(css_class)}(?:\s|$)"))
@@ -0,0 +1,386 @@
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Callable
+import json
+import logging
+import re
+import requests
+from lepi_http import http_get, http_get_content, response_json
+from lepi_wikipedia import fetch_wikipedia_extract
+from lepi_parsing import class_strainer, make_soup
+from lepi_dyntaxa import get_taxon_id, has_taxon_index
+
+
+logger = logging.getLogger("lepi")
+
+try:
+    with open("secrets.json") as f:
+        secrets = json.load(f)
+    api_key = secrets.get("artfakta_api_key")
+except FileNotFoundError:
+    logger.warning("secrets.json file not found. Please create it with your API key.")
+    api_key = None
+
+class FetchFailure(str):
+    """
+    Empty description returned when a source could not be queried (network error, throttling,
+    missing credentials...), as opposed to a source that answered without a description.
+
+    It compares equal to "" so callers can keep treating it as an empty description; test
+    for it with `desc is FETCH_FAILED`.
+    """
+
+
+FETCH_FAILED = FetchFailure()
+
+# HTTP statuses meaning the source definitely has no page for the taxon
+_NOT_FOUND_STATUS_CODES = {404, 410}
+
+# Matches a section heading line of a plain-text Wikipedia extract, e.g. '== Description =='
+_WIKI_HEADING = re.compile(r"\n==+[ \t]*([^=\n]+?)[ \t]*==+[ \t]*\n")
+
+# The taxonomy parser only reads the body field, so only it is built into a tree
+_BAMONA_TAXONOMY_STRAINER = class_strainer("div", "field-name-body")
+
+
+ARTFAKTA_URL = "https://api.artdatabanken.se/information/v1/speciesdataservice/v1/speciesdata/texts"
+ARTFAKTA_BATCH_SIZE = 50
+# (connect, read) seconds; a batch response carries up to ARTFAKTA_BATCH_SIZE texts
+ARTFAKTA_BATCH_TIMEOUT = (3.05, 30)
+
+# taxon ID -> 'characteristic' text, filled by single and batched Artfakta requests
+_artfakta_characteristics: dict[str, str] = {}
+
+
+def _artfakta_headers() -> dict[str, str]:
+    """
+    Returns the headers authenticating a request to the Artfakta API.
+    """
+    return {
+        "Ocp-Apim-Subscription-Key": api_key,
+        "Cache-Control": "no-cache"
+    }
+
+
+def _fetch_artfakta_characteristic(taxon_id: str) -> str:
+    """
+    Requests the Artfakta species texts for a taxon ID and returns its 'characteristic' field.
+
+    Results are memoized per taxon ID. Failed requests raise, so they are not cached.
+
+    Args:
+        taxon_id (str): The numeric taxon ID, e.g., '213903'.
+
+    Returns:
+        str: The 'characteristic' text, or "" if the response does not contain it.
+    """
+    if taxon_id in _artfakta_characteristics:
+        return _artfakta_characteristics[taxon_id]
+
+    source_name = "artfakta.se"
+    response = http_get(ARTFAKTA_URL, params={"taxa": taxon_id}, headers=_artfakta_headers())
+    data = response_json(response)
+
+    if not data or not isinstance(data, list) or "speciesData" not in data[0]:
+        logger.warning("[%s] Unexpected API response structure.", source_name)
+        characteristic = ""
+    elif data[0]["speciesData"].get("characteristic", "") == None:
+        logger.info("[%s] 'characteristic' field not found in API response.", source_name)
+        characteristic = ""
+    else:
+        characteristic = data[0]["speciesData"].get("characteristic", "").strip()
+
+    _artfakta_characteristics[taxon_id] = characteristic
+    return characteristic
+
+
+def fetch_artfakta_batch(names: list[str], rank: str | None = None) -> dict[str, str]:
+    """
+    Fetches the Artfakta 'characteristic' texts of many taxa at once.
+
+    The `taxa` parameter of the API accepts several taxon IDs, so the uncached IDs are
+    requested ARTFAKTA_BATCH_SIZE at a time instead of one request per taxon. The texts are
+    stored in the cache used by fetch_artfakta_description, so later per-taxon calls are
+    served without a request. Taxa missing from a batched response are left to that
+    per-taxon fallback.
+
+    Args:
+        names (list[str]): Scientific names of the taxa.
+        rank (str | None): Taxonomic rank used to resolve the taxon IDs (e.g. 'genus'),
+            or None to match any rank.
+
+    Returns:
+        dict: { name: characteristic } for every name whose text is now cached.
+    """
+    source_name = "artfakta.se"
+    if api_key is None or not has_taxon_index():
+        # Unauthenticated requests are rejected, and without the index there are no IDs
+        return {}
+    taxon_ids = {name: get_taxon_id(name, rank) for name in names}
+    missing_ids = sorted({
+        taxon_id for taxon_id in taxon_ids.values()
+        if taxon_id is not None and taxon_id not in _artfakta_characteristics
+    })
+
+    for start in range(0, len(missing_ids), ARTFAKTA_BATCH_SIZE):
+        batch = missing_ids[start:start + ARTFAKTA_BATCH_SIZE]
+        try:
+            # The API expects the IDs as one comma-separated value: ?taxa=1,2,3
+            response = http_get(
+                ARTFAKTA_URL,
+                params={"taxa": ",".join(batch)},
+                headers=_artfakta_headers(),
+                timeout=ARTFAKTA_BATCH_TIMEOUT,
+            )
+            data = response_json(response)
+        except requests.RequestException as e:
+            logger.warning("[%s] Batched API request failed: %s", source_name, e)
+            continue
+
+        if not isinstance(data, list):
+            logger.warning("[%s] Unexpected API response structure.", source_name)
+            continue
+        for entry in data:
+            if not isinstance(entry, dict) or entry.get("taxonId") is None or "speciesData" not in entry:
+                continue
+            characteristic = entry["speciesData"].get("characteristic") or ""
+            _artfakta_characteristics[str(entry["taxonId"])] = characteristic.strip()
+
+    return {
+        name: _artfakta_characteristics[taxon_id]
+        for name, taxon_id in taxon_ids.items()
+        if taxon_id in _artfakta_characteristics
+    }
+
+
+def fetch_artfakta_description(name: str, rank: str | None = None) -> dict[str, str]:
+    """
+    Fetches the 'characteristic' field from the Artfakta API for a taxon.
+
+    Args:
+        name (str): Scientific name of the taxon (e.g. 'Melitaea').
+        rank (str | None): Taxonomic rank used to resolve the taxon ID (e.g. 'genus'),
+            or None to match any rank.
+
+    Returns:
+        dict: { 'artfakta.se': description from 'characteristic' }, or FETCH_FAILED if the
+            API could not be queried.
+    """
+    source_name = "artfakta.se"
+    if api_key is None or not has_taxon_index():
+        # Without credentials or the Dyntaxa index the API cannot be queried at all
+        return {source_name: FETCH_FAILED}
+    taxon_id = get_taxon_id(name, rank)
+    if taxon_id is None:
+        return {source_name: ""}
+
+    try:
+        return {source_name: _fetch_artfakta_characteristic(taxon_id)}
+
+    except requests.RequestException as e:
+        logger.warning("[%s] API request failed: %s", source_name, e)
+        return {source_name: FETCH_FAILED}
+
+
+def fetch_page_description(source_name: str, url: str, parser: Callable[[bytes], str | None]) -> dict[str, str]:
+    """
+    Downloads a page and extracts its description with a source-specific parser.
+
+    This is the shared skeleton of the page-scraping fetchers: a source only provides its
+    URL and a parser. A missing page (404/410) or a page without the description gives "";
+    any other failure is logged and gives FETCH_FAILED.
+
+    Args:
+        source_name (str): Name of the source, used as the key of the result (e.g. 'nrm.se').
+        url (str): URL of the page.
+        parser (Callable): Function returning the description of a page, or
+            None if the page does not contain one.
+
+    Returns:
+        dict: { source_name: description }, with "" if the source has no description and
+            FETCH_FAILED if the page could not be fetched.
+    """
+    logger.debug("[%s] Fetching %s", source_name, url)
+    try:
+        html = http_get_content(url)
+    except requests.HTTPError as e:
+        if e.response is not None and e.response.status_code in _NOT_FOUND_STATUS_CODES:
+            logger.info("[%s] No page at %s", source_name, url)
+            return {source_name: ""}
+        logger.warning("[%s] Failed to fetch %s: %s", source_name, url, e)
+        return {source_name: FETCH_FAILED}
+    except requests.RequestException as e:
+        logger.warning("[%s] Failed to fetch %s: %s", source_name, url, e)
+        return {source_name: FETCH_FAILED}
+
+    text = parser(html)
+    if text is None:
+        logger.info("[%s] Description not found on page: %s", source_name, url)
+        return {source_name: ""}
+    return {source_name: text}
+
+
+def _parse_bamona_taxonomy_html(html: bytes) -> str | None:
+    """
+    Extracts the body text from a butterfliesandmoths.org taxonomy page.
+
+    Args:
+        html (bytes): Raw HTML of the taxonomy page.
+
+    Returns:
+        str | None: The description, or None if the body field is missing.
+    """
+    soup = make_soup(html, _BAMONA_TAXONOMY_STRAINER)
+
+    description_div = soup.select_one(
+        "div.field.field-name-body.field-type-text-with-summary.field-label-hidden"
+    )
+    if not description_div:
+        return None
+    return description_div.get_text(separator=" ", strip=True)
+
+
+def fetch_bamona_taxonomy_description(name: str) -> dict[str, str]:
+    """
+    Fetches the description of a higher taxon (family, genus) from butterfliesandmoths.org.
+
+    Args:
+        name (str): Name of the taxon (e.g. 'Hesperiidae').
+
+    Returns:
+        dict: Dictionary with the source name as key and extracted description as value.
+    """
+    source_name = "butterfliesandmoths.org"
+    base_url = "https://www.butterfliesandmoths.org/taxonomy/"
+    url = f"{base_url}{name}"
+    return fetch_page_description(source_name, url, _parse_bamona_taxonomy_html)
+
+
+@lru_cache(maxsize=None)
+def _heading_pattern(section_keywords: tuple[str, ...]) -> re.Pattern:
+    """
+    Compiles a case-insensitive pattern matching any of the section keywords.
+
+    Args:
+        section_keywords (tuple[str, ...]): Words identifying a descriptive section.
+
+    Returns:
+        re.Pattern: The compiled pattern, built once per keyword tuple.
+    """
+    return re.compile("|".join(re.escape(keyword) for keyword in section_keywords), re.IGNORECASE)
+
+
+def _extract_description(content: str, section_keywords: tuple[str, ...]) -> str:
+    """
+    Extracts the first section of a plain-text Wikipedia extract whose heading mentions a keyword.
+
+    Headings are found lazily with a single forward regex scan that stops at the first
+    matching section, and only the short headings are searched with a precompiled
+    case-insensitive keyword pattern. Section bodies are sliced only when returned.
+
+    Args:
+        content (str): Plain-text article, with headings written as '== Heading =='.
+        section_keywords (tuple[str, ...]): Words identifying a descriptive section.
+
+    Returns:
+        str: The body of the matching section, or the full content if no heading matches.
+    """
+    heading_pattern = _heading_pattern(section_keywords)
+    headings = _WIKI_HEADING.finditer(content)
+    heading = next(headings, None)
+    while heading is not None:
+        next_heading = next(headings, None)
+        if heading_pattern.search(heading.group(1)):
+            # The section body runs until the next heading, or to the end of the article
+            end = next_heading.start() if next_heading is not None else len(content)
+            body = content[heading.end():end].strip()
+            if body:
+                return body
+        heading = next_heading
+
+    # Fallback: return full content
+    return content.strip()
+
+
+@lru_cache(maxsize=512)
+def _wikipedia_extract(name: str) -> str:
+    """
+    Downloads the plain-text content of a Wikipedia article.
+
+    Memoized per title, so the same article requested with different section keywords (e.g.
+    a name processed at two levels) costs a single API call. Failed lookups raise, so they
+    are not cached.
+
+    Args:
+        name (str): Title of the Wikipedia article (e.g. 'Hesperiidae').
+
+    Returns:
+        str: Plain-text content of the article.
+    """
+    return fetch_wikipedia_extract(name)
+
+
+@lru_cache(maxsize=2048)
+def _wikipedia_description_for(name: str, section_keywords: tuple[str, ...]) -> str:
+    """
+    Downloads a Wikipedia article and extracts its descriptive section.
+
+    Results are memoized per name. Failed lookups raise, so they are not cached.
+
+    Args:
+        name (str): Title of the Wikipedia article (e.g. 'Hesperiidae').
+        section_keywords (tuple[str, ...]): Words identifying a descriptive section.
+
+    Returns:
+        str: The extracted section, or the full article content if no such section exists.
+    """
+    return _extract_description(_wikipedia_extract(name), section_keywords)
+
+
+def fetch_wikipedia_description(name: str, section_keywords: tuple[str, ...] = ("description",)) -> dict[str, str]:
+    """
+    Fetches the descriptive section, or the full content, of the Wikipedia article for a taxon.
+
+    Args:
+        name (str): Name of the taxon (e.g. 'Hesperiidae').
+        section_keywords (tuple[str, ...]): Words identifying a descriptive section.
+
+    Returns:
+        dict: { 'wikipedia.org': description_text }, or FETCH_FAILED if the API request failed.
+    """
+    source_name = "wikipedia.org"
+    try:
+        return {source_name: _wikipedia_description_for(name, section_keywords)}
+
+    except requests.RequestException as e:
+        logger.warning("[%s] Failed to fetch page for %s: %s", source_name, name, e)
+        return {source_name: FETCH_FAILED}
+    except ValueError as e:
+        # Missing or disambiguation page
+        logger.info("[%s] No article for %s: %s", source_name, name, e)
+        return {source_name: ""}
+    except Exception as e:
+        logger.warning("[%s] Failed to fetch page for %s: %s", source_name, name, e)
+        return {source_name: FETCH_FAILED}
+
+
+def fetch_all_descriptions(name: str, fetchers: tuple[Callable[[str], dict[str, str]], ...]) -> dict[str, str]:
+    """
+    Runs independent source fetchers concurrently and merges their results.
+
+    The sources are network-bound and share no state, so they run in a thread pool and the
+    total time is roughly that of the slowest source instead of the sum of all of them.
+
+    Args:
+        name (str): Name of the taxon passed to every fetcher.
+        fetchers (tuple): Functions returning a { source_name: description } dict.
+
+    Returns:
+        dict: { source_name: description }, in the order of `fetchers`.
+    """
+    if not fetchers:
+        return {}
+    with ThreadPoolExecutor(max_workers=len(fetchers)) as executor:
+        # executor.map keeps the results in the order of `fetchers`
+        results = executor.map(lambda fetch: fetch(name), fetchers)
+        return {source: desc for descriptions in results for source, desc in descriptions.items()}
@@ -1,29 +1,32 @@
 from typing import Literal
-import requests
-from bs4 import BeautifulSoup
-from wikipedia import WikipediaPage
-import pandas as pd
+import logging
+from bs4 import SoupStrainer
+from lepi_parsing import class_strainer, make_soup
+from lepi_dyntaxa import get_taxon_id
+from lepi_coverage import SPECIES_COVERAGE
+from lepi_sources import (
+    FETCH_FAILED,
+    fetch_all_descriptions,
+    fetch_artfakta_description,
+    fetch_page_description,
+    fetch_wikipedia_description,
+)
+from lepi_logging import setup_logging
 
 
 TaxonomicLevel = Literal["family", "species"]
 
-try:
-    df_dyntaxa = pd.read_csv("../dyntaxa_DB/Taxon.csv", sep="	", encoding="utf-8")
+logger = logging.getLogger("lepi")
 
-except FileNotFoundError:
-    print("File not found. Please check the path to the dataset for the taxon id generation.")
-    df_dyntaxa = pd.DataFrame()
-
-import json
-
-try:
-    with open("secrets.json") as f:
-        secrets = json.load(f)
-    api_key = secrets.get("artfakta_api_key")
-except FileNotFoundError:
-    print("secrets.json file not found. Please create it with your API key.")
-    api_key = None
+# Only the page regions the parsers read are built into a tree
+_UKMOTHS_STRAINER = class_strainer("div", "speciestext")
+_BAMONA_STRAINER = class_strainer("div", "pane-content")
+_NRM_STRAINER = SoupStrainer("td", attrs={"valign": "TOP", "align": "LEFT"})
 
+# Markers of the NRM species text: description start/end, and the external links line
+_NRM_START = "Kännetecken:"
+_NRM_END = "Utbredning:"
+_NRM_LINKS = "Mer om denna art på"
 
 
 def get_artfakta_id(species_name: str) -> str | None:
@@ -32,23 +35,16 @@ def get_artfakta_id(species_name: str) -> str | None:
 
     Args:
         species_name (str): Scientific name (e.g., 'Elymus caninus')
-        dataset_path (str): Path to CSV with column 'scientificName' and 'taxonId'
 
     Returns:
         str | None: Taxon ID number (e.g. '222441') or None if not found
     """
-    df_dyntaxa["scientificName"] = df_dyntaxa["scientificName"].str.strip().str.lower()
-    match = df_dyntaxa[df_dyntaxa["scientificName"] == species_name.strip().lower()]
-    if not match.empty:
-        full_id = match.iloc[0]["acceptedNameUsageID"]
-        if isinstance(full_id, str):
-            return full_id.split(":")[-1]  # extract the number part
-    return None
+    return get_taxon_id(species_name)
 
 
 def fetch_wikipedia_species_description(species_name: str) -> dict[str, str]:
     """
-    Fetches the 'Description' section or full Wikipedia content for a given species.
+    Fetches the 'Description' (or 'Imago') section or full Wikipedia content for a given species.
 
     Args:
         species_name (str): Full scientific name of the species (e.g. 'Papilio machaon').
@@ -56,32 +52,50 @@ def fetch_wikipedia_species_description(species_name: str) -> dict[str, str]:
     Returns:
         dict: { 'wikipedia.org': extracted_text }
     """
-    source_name = "wikipedia.org"
+    return fetch_wikipedia_description(species_name, ("description", "imago"))
+
+
+def species_slug(species_name: str, separator: str, lowercase: bool = False) -> str:
+    """
+    Builds the URL slug of a species name, as used by the species pages of each source.
+
+    Args:
+        species_name (str): Scientific name (e.g., 'Archiearis parthenias').
+        separator (str): Replaces the space between genus and epithet ('-' or '_').
+        lowercase (bool): Whether the source expects a lowercase slug.
 
-    try:
-        page = WikipediaPage(species_name)
-        content = page.content
+    Returns:
+        str: The slug (e.g. 'archiearis-parthenias').
+    """
+    slug = species_name.strip().replace(" ", separator)
+    return slug.lower() if lowercase else slug
 
-        # Try to extract a "Description"-related section
-        sections = content.split("\n==")
-        for section in sections:
-            if "description" in section.lower() and len(section) > 20:
-                #print(section)
-                lines = section.split("\n")
-                return {source_name: "\n".join(lines[1:]).strip()}
-            elif "imago" in section.lower() and len(section) > 20:
-                lines = section.split("\n")
-                return {source_name: "\n".join(lines[1:]).strip()}
-            
 
-        # Fallback: return full content
-        return {source_name: content.strip()}
+def _parse_ukmoths_html(html: bytes) -> str | None:
+    """
+    Extracts the species text from a UKMoths species page.
 
-    except Exception as e:
-        print(f"[{source_name}] Failed to fetch page for {species_name}: {e}")
-        return {source_name: ""}
+    Args:
+        html (bytes): Raw HTML of the species page.
 
+    Returns:
+        str | None: The description, or None if the species text block is missing.
+    """
+    soup = make_soup(html, _UKMOTHS_STRAINER)
 
+    content_div = soup.select_one("div.span7.speciestext")
+    if not content_div:
+        return None
+
+    # Prefer <p> tags if present; each paragraph's text is extracted only once
+    paragraphs = content_div.select("p")
+    if paragraphs:
+        return "\n\n".join(text for text in (p.get_text(strip=True) for p in paragraphs) if text)
+
+    # If no <p>, extract all text, replacing <br> with newlines
+    for br in content_div.find_all("br"):
+        br.replace_with("\n")
+    return content_div.get_text(separator="", strip=True)
 
 
 def fetch_ukmoths_species_description(species_name: str) -> dict[str, str]:
@@ -96,39 +110,42 @@ def fetch_ukmoths_species_description(species_name: str) -> dict[str, str]:
     """
     source_name = "ukmoths.org.uk"
     base_url = "https://ukmoths.org.uk/species/"
-    species_slug = species_name.strip().lower().replace(" ", "-")
-    url = f"{base_url}{species_slug}/"
-    result = {}
+    slug = species_slug(species_name, "-", lowercase=True)
+    url = f"{base_url}{slug}/"
+    return fetch_page_description(source_name, url, _parse_ukmoths_html)
 
-    try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, "html.parser")
 
-        content_div = soup.find("div", class_="span7 speciestext")
-        if not content_div:
-            print(f"[{source_name}] Content div not found at {url}")
-            return {source_name: ""}
+def _parse_bamona_species_html(html: bytes) -> str | None:
+    """
+    Extracts the labeled fields from a BAMONA species page.
 
-        # Prefer <p> tags if present
-        paragraphs = content_div.find_all("p")
-        if paragraphs:
-            text = "\n\n".join(p.get_text(strip=True) for p in paragraphs if p.get_text(strip=True))
-        else:
-            # If no <p>, extract all text, replacing <br> with newlines
-            for br in content_div.find_all("br"):
-                br.replace_with("\n")
-            text = content_div.get_text(separator="", strip=True)
+    Args:
+        html (bytes): Raw HTML of the species page.
+
+    Returns:
+        str | None: One 'Label: content' line per non-empty field, or None if the
+            description block is missing.
+    """
+    soup = make_soup(html, _BAMONA_STRAINER)
 
-        full_text = text
+    description_block = soup.select_one("div.pane-content")
+    if not description_block:
+        return None
 
-        result[source_name] = full_text
-        return result
+    # Extract all field pairs: label and content
+    data = []
+    fields = description_block.select("div.views-field")
+    for field in fields:
+        label_tag = field.select_one("strong.views-label")
+        content_tag = field.select_one("span.field-content")
 
+        if label_tag and content_tag:
+            label = label_tag.get_text(strip=True).rstrip(":")
+            content = content_tag.get_text(strip=True)
+            if content:
+                data.append(f"{label}: {content}")
 
-    except requests.RequestException as e:
-        print(f"[{source_name}] Failed to fetch {url}: {e}")
-        return {source_name: ""}
+    return "\n".join(data)
 
 
 def fetch_bamona_species_description(species_name: str) -> dict[str, str]:
@@ -143,115 +160,100 @@ def fetch_bamona_species_description(species_name: str) -> dict[str, str]:
     """
     source_name = "butterfliesandmoths.org"
     base_url = "https://www.butterfliesandmoths.org/species/"
-    species_slug = species_name.strip().replace(" ", "-")
-    url = f"{base_url}{species_slug}"
-    result = {}
-    #print(url)
-    try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, "html.parser")
+    slug = species_slug(species_name, "-")
+    url = f"{base_url}{slug}"
+    return fetch_page_description(source_name, url, _parse_bamona_species_html)
 
-        description_block = soup.find("div", class_="pane-content")
-        if not description_block:
-            print(f"[{source_name}] Description block not found at {url}")
-            return {source_name: ""}
 
-        # Extract all field pairs: label and content
-        data = []
-        fields = description_block.find_all("div", class_="views-field")
-        for field in fields:
-            label_tag = field.find("strong", class_="views-label")
-            content_tag = field.find("span", class_="field-content")
-
-            if label_tag and content_tag:
-                label = label_tag.get_text(strip=True).rstrip(":")
-                content = content_tag.get_text(strip=True)
-                if content:
-                    data.append(f"{label}: {content}")
-
-        if data:
-            result[source_name] = "\n".join(data)
-        else:
-            result[source_name] = ""
-
-        return result
-
-    except requests.RequestException as e:
-        print(f"[{source_name}] Failed to fetch {url}: {e}")
-        return {source_name: ""}
+def _parse_nrm_html(html: bytes) -> str | None:
+    """
+    Extracts the descriptive text from an NRM Svenska Fjärilar species page.
+    - If the page includes 'Kännetecken:' and 'Utbredning:', extracts that section.
+    - Otherwise, returns all text after images and before external links.
 
+    Args:
+        html (bytes): Raw HTML of the species page.
 
-import requests
-from bs4 import BeautifulSoup
+    Returns:
+        str | None: The cleaned description, or None if the text cell is missing.
+    """
+    soup = make_soup(html, _NRM_STRAINER)
+
+    td = soup.select_one('td[valign="TOP"][align="LEFT"]')
+    if not td:
+        return None
+
+    # Replace <br> with newlines
+    for br in td.find_all("br"):
+        br.replace_with("\n")
+
+    full_text = td.get_text(separator="\n", strip=True)
+
+    # Try structured extraction; the end marker is only searched for after the start marker
+    start_idx = full_text.find(_NRM_START)
+    if start_idx != -1:
+        end_idx = full_text.find(_NRM_END, start_idx + len(_NRM_START))
+        return full_text[start_idx:end_idx].strip() if end_idx != -1 else full_text[start_idx:].strip()
+
+    # Fallback: remove anything before the first scientific name line
+    lines = full_text.split("\n")
+    content_lines = []
+    found_scientific_name = False
+    for line in lines:
+        if not found_scientific_name and "(" in line and ")" in line:
+            found_scientific_name = True
+        if found_scientific_name:
+            if _NRM_LINKS in line:
+                break
+            content_lines.append(line)
+    return "\n".join(content_lines).strip()
 
 
 def fetch_nrm_species_description(species_name: str) -> dict[str, str]:
     """
     Fetches the descriptive text from NRM Svenska Fjärilar for a given species.
-    - If the page includes 'Kännetecken:' and 'Utbredning:', extracts that section.
-    - Otherwise, returns all text after images and before external links.
 
     Args:
         species_name (str): Scientific name (e.g., 'Archiearis parthenias').
-        debug (bool): If True, prints debug info.
 
     Returns:
         dict: { 'nrm.se': cleaned_description }
     """
     source_name = "nrm.se"
     base_url = "http://www2.nrm.se/en/svenska_fjarilar/"
-    species_slug = species_name.lower().replace(" ", "_")
-    first_letter = species_slug[0]
-    url = f"{base_url}{first_letter}/{species_slug}.html"
-    result = {}
-
-    try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, "html.parser")
-
-        td = soup.find("td", valign="TOP", align="LEFT")
-        if not td:
-            print(f"[{source_name}] No matching <td> found at {url}")
-            return {source_name: ""}
-
-        # Replace <br> with newlines
-        for br in td.find_all("br"):
-            br.replace_with("\n")
-
-        full_text = td.get_text(separator="\n", strip=True)
-
-        # Try structured extraction
-        start_key = "Kännetecken:"
-        end_key = "Utbredning:"
-        start_idx = full_text.find(start_key)
-        end_idx = full_text.find(end_key)
-
-        if start_idx != -1 and (end_idx == -1 or end_idx > start_idx):
-            cleaned_text = full_text[start_idx:end_idx].strip() if end_idx != -1 else full_text[start_idx:].strip()
-        else:
-            # Fallback: remove anything before the first scientific name line
-            lines = full_text.split("\n")
-            content_lines = []
-            found_scientific_name = False
-            for line in lines:
-                if not found_scientific_name and "(" in line and ")" in line:
-                    found_scientific_name = True
-                if found_scientific_name:
-                    if "Mer om denna art på" in line:
-                        break
-                    content_lines.append(line)
-            cleaned_text = "\n".join(content_lines).strip()
-
-        result[source_name] = cleaned_text
-        return result
-
-    except requests.RequestException as e:
-        print(f"[{source_name}] Failed to fetch {url}: {e}")
-        return {source_name: ""}
+    slug = species_slug(species_name, "_", lowercase=True)
+    first_letter = slug[0]
+    url = f"{base_url}{first_letter}/{slug}.html"
+    return fetch_page_description(source_name, url, _parse_nrm_html)
 
 
+def _parse_adw_html(html: bytes) -> str | None:
+    """
+    Extracts the 'Physical Description' paragraphs from an Animal Diversity Web account.
+
+    Args:
+        html (bytes): Raw HTML of the species account.
+
+    Returns:
+        str | None: The paragraphs of the section, or None if the section is missing.
+    """
+    soup = make_soup(html)
+
+    section_header = soup.select_one("h3#physical_description")
+    if not section_header:
+        return None
+
+    # Collect all paragraphs until the next <h3>. A single sibling selector returns the
+    # following <p> and <h3> siblings in document order, so only those are visited.
+    paragraphs = []
+    for node in soup.select("h3#physical_description ~ p, h3#physical_description ~ h3"):
+        if node.name == "h3":
+            break
+        text = node.get_text(strip=True)
+        if text:
+            paragraphs.append(text)
+
+    return "\n\n".join(paragraphs)
 
 
 def fetch_adw_species_description(species_name: str) -> dict[str, str]:
@@ -266,88 +268,33 @@ def fetch_adw_species_description(species_name: str) -> dict[str, str]:
     """
     source_name = "animaldiversity.org"
     base_url = "https://animaldiversity.org/accounts/"
-    species_slug = species_name.strip().replace(" ", "_")
-    url = f"{base_url}{species_slug}/"
-    result = {}
-    print(url)
-    try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, "html.parser")
-
-        section_header = soup.find("h3", id="physical_description")
-        if not section_header:
-            print(f"[{source_name}] Section 'Physical Description' not found at {url}")
-            return {source_name: ""}
-
-        # Collect all paragraphs until the next <h3>
-        paragraphs = []
-        next_node = section_header.find_next_sibling()
-        while next_node:
-            if next_node.name == "h3":
-                break
-            if next_node.name == "p":
-                text = next_node.get_text(strip=True)
-                if text:
-                    paragraphs.append(text)
-            next_node = next_node.find_next_sibling()
-
-        description_text = "\n\n".join(paragraphs)
-        result[source_name] = description_text
-
-        return result
-
-    except requests.RequestException as e:
-        print(f"[{source_name}] Failed to fetch {url}: {e}")
-        return {source_name: ""}
-
-
+    slug = species_slug(species_name, "_")
+    url = f"{base_url}{slug}/"
+    return fetch_page_description(source_name, url, _parse_adw_html)
 
 
 def fetch_artfakta_species_description_api(species_name: str) -> dict[str, str]:
     """
-    Fetches the 'characteristic' field from the Artfakta API using a taxon ID.
+    Fetches the 'characteristic' field from the Artfakta API for a species.
 
     Args:
-        taxon_id (str): The numeric taxon ID, e.g., '213903'.
-        api_key (str): Your Artfakta API key.
+        species_name (str): Scientific name (e.g., 'Cochylis hybridella').
 
     Returns:
         dict: { 'artfakta.se': species description from 'characteristic' }
     """
-    source_name = "artfakta.se"
-    taxon_id = get_artfakta_id(species_name)
-    #print(f"Taxon ID for {species_name}: {taxon_id}")
-    if taxon_id is None:   
-        return {source_name: ""}
-
-    
-    url = f"https://api.artdatabanken.se/information/v1/speciesdataservice/v1/speciesdata/texts?taxa={taxon_id}"
-    headers = {
-        "Ocp-Apim-Subscription-Key": api_key,
-        "Cache-Control": "no-cache"
-    }
-    try:
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-
-        if not data or not isinstance(data, list) or "speciesData" not in data[0]:
-            print(f"[{source_name}] Unexpected API response structure.")
-            return {source_name: ""}
-        if data[0]["speciesData"].get("characteristic", "") == None:
-            print(f"[{source_name}] 'characteristic' field not found in API response.")
-            return {source_name: ""}
-        else:
-            characteristic = data[0]["speciesData"].get("characteristic", "").strip()
-
-        return {source_name: characteristic}
-
-    except requests.RequestException as e:
-        print(f"[{source_name}] API request failed: {e}")
-        return {source_name: ""}
+    return fetch_artfakta_description(species_name)
 
 
+# Every species source, keyed by the source name its fetcher returns
+SPECIES_FETCHERS = {
+    "wikipedia.org": fetch_wikipedia_species_description,
+    "ukmoths.org.uk": fetch_ukmoths_species_description,
+    "butterfliesandmoths.org": fetch_bamona_species_description,
+    "nrm.se": fetch_nrm_species_description,
+    "animaldiversity.org": fetch_adw_species_description,
+    "artfakta.se": fetch_artfakta_species_description_api,
+}
 
 
 def process_by_species(spe_name: str) -> dict[str, str]:
@@ -357,23 +304,22 @@ def process_by_species(spe_name: str) -> dict[str, str]:
     Args:
         name (str): Name of the species (e.g. 'Attacus atlas').
     """
-    print(f"Processing species: {spe_name}")
-    all_descriptions = {}
-    print("Fetching descriptions...")
-    print("wikipedia.org")
-    all_descriptions.update(fetch_wikipedia_species_description(spe_name))
-    print("ukmoths.org.uk")
-    all_descriptions.update(fetch_ukmoths_species_description(spe_name))
-    print("butterfliesandmoths.org")
-    all_descriptions.update(fetch_bamona_species_description(spe_name))
-    #print("animaldiversity.org")
-    all_descriptions.update(fetch_nrm_species_description(spe_name))
-    #print("nrm.se")
-    all_descriptions.update(fetch_adw_species_description(spe_name))
-    #print("artfakta.se")
-    all_descriptions.update(fetch_artfakta_species_description_api(spe_name))
-    for source, desc in all_descriptions.items():
-        print(f"\n--- {source} ---\n{desc[:100]} \ndesc_len:{len(desc)}\n")
+    logger.info("Processing species: %s", spe_name)
+    # Skip the sources that definitely had nothing for this species on a previous run
+    missed_sources = SPECIES_COVERAGE.misses_for(spe_name)
+    fetchers = tuple(fetch for source, fetch in SPECIES_FETCHERS.items() if source not in missed_sources)
+
+    descriptions = fetch_all_descriptions(spe_name, fetchers)
+    # Failed requests are left out of both sets, so those sources are queried again next time
+    SPECIES_COVERAGE.record(
+        spe_name,
+        missed={source for source, desc in descriptions.items() if desc == "" and desc is not FETCH_FAILED},
+        found={source for source, desc in descriptions.items() if desc},
+    )
+    all_descriptions = {source: descriptions.get(source, "") for source in SPECIES_FETCHERS}
+    if logger.isEnabledFor(logging.DEBUG):
+        for source, desc in all_descriptions.items():
+            logger.debug("\n--- %s ---\n%s \ndesc_len:%d\n", source, desc[:100], len(desc))
 
     return all_descriptions
 
@@ -394,7 +340,7 @@ def process_taxonomic_level(level: TaxonomicLevel, name: str) -> None:
 
 
 if __name__ == "__main__":
-
+    setup_logging(logging.INFO)
     level_input = 'species'  # input("Enter the taxonomic level (family/species): ").strip().lower()
     name_input = 'Cochylis hybridella'
     all_descriptions = process_taxonomic_level(level_input, name_input)
@@ -0,0 +1,41 @@
+from lepi_http import http_get, response_json
+
+
+WIKIPEDIA_API = "https://en.wikipedia.org/w/api.php"
+
+
+def fetch_wikipedia_extract(title: str) -> str:
+    """
+    Fetches the plain-text content of a Wikipedia article with a single MediaWiki API call.
+
+    The text has the same layout as `wikipedia.WikipediaPage(title).content`, with section
+    headings written as '== Heading =='. Redirects are followed.
+
+    Args:
+        title (str): Title of the article (e.g. 'Hesperiidae').
+
+    Returns:
+        str: Plain-text content of the article.
+
+    Raises:
+        ValueError: If the article does not exist or is a disambiguation page.
+        requests.RequestException: If the API request fails.
+    """
+    params = {
+        "action": "query",
+        "format": "json",
+        "prop": "extracts|pageprops",
+        "ppprop": "disambiguation",
+        "explaintext": 1,
+        "redirects": 1,
+        "titles": title,
+    }
+    response = http_get(WIKIPEDIA_API, params=params)
+    pages = response_json(response).get("query", {}).get("pages", {})
+    page = next(iter(pages.values()), {})
+
+    if "missing" in page or "invalid" in page or not page:
+        raise ValueError(f"Wikipedia page '{title}' does not exist")
+    if "disambiguation" in page.get("pageprops", {}):
+        raise ValueError(f"'{title}' is a Wikipedia disambiguation page")
+    return page.get("extract", "")
@@ -1,6 +1,68 @@
+import csv
+import logging
+import os
+import sys
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 from lepi_genus_scrapper import process_taxonomic_level as process_species_taxonomic_level
+from lepi_sources import fetch_artfakta_batch
+from lepi_logging import setup_logging
 
+logger = logging.getLogger("lepi")
+
+# Taxa processed at the same time; per-host limits in lepi_http keep each source polite
+MAX_TAXON_WORKERS = 8
+OUTPUT_COLUMNS = ["taxon", "level", "source", "description", "desc_len"]
+
+
+def read_taxon_names(file_path: str) -> list[str]:
+    """
+    Lee los nombres de taxones de un archivo de texto (uno por línea), ignorando líneas vacías.
+
+    Args:
+        file_path (str): Ruta al archivo de texto con nombres.
+
+    Returns:
+        list[str]: Nombres de los taxones, en orden.
+    """
+    with open(file_path) as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def iter_description_rows(taxon_names: list[str], level: str) -> Iterator[dict]:
+    """
+    Genera las filas de descripciones de una lista de taxones, usando process_taxonomic_level.
+
+    Los taxones se procesan en paralelo, pero las filas salen en el orden de `taxon_names`
+    y todas las filas de un taxón se generan juntas.
+
+    Args:
+        taxon_names (list[str]): Nombres de los taxones.
+        level (TaxonomicLevel): 'species' o 'family'.
+
+    Yields:
+        dict: Fila con las claves de OUTPUT_COLUMNS.
+    """
+    # Prime the Artfakta cache with batched requests instead of one request per taxon
+    fetch_artfakta_batch(taxon_names, None if level == "species" else level)
+
+    def process(name: str) -> dict[str, str]:
+        logger.info("=== Processing %s: %s ===", level, name)
+        return process_species_taxonomic_level(level, name)
+
+    # Overlap the network waits of different taxa. executor.map yields the results in input
+    # order, so the rows come out in the same order as the sequential loop.
+    with ThreadPoolExecutor(max_workers=MAX_TAXON_WORKERS) as executor:
+        for name, descriptions in zip(taxon_names, executor.map(process, taxon_names)):
+            for source, desc in descriptions.items():
+                yield {
+                    "taxon": name,
+                    "level": level,
+                    "source": source,
+                    "description": desc,
+                    "desc_len": len(desc)
+                }
 
 
 def process_species_list_with_routing(file_path: str, level: str) -> pd.DataFrame:
@@ -14,27 +76,51 @@ def process_species_list_with_routing(file_path: str, level: str) -> pd.DataFram
     Returns:
         pd.DataFrame: DataFrame con columnas [species, source, description, desc_len]
     """
-    with open(file_path) as f:
-        taxon_names = [line.strip() for line in f if line.strip()]
-
-    all_rows = []
-    for name in taxon_names:
-        print(f"\n=== Processing {level}: {name} ===")
-        descriptions = process_species_taxonomic_level(level, name)
-        for source, desc in descriptions.items():
-            all_rows.append({
-                "taxon": name,
-                "level": level,
-                "source": source,
-                "description": desc,
-                "desc_len": len(desc)
-            })
-
-    df = pd.DataFrame(all_rows)
-    return df
+    rows = iter_description_rows(read_taxon_names(file_path), level)
+    return pd.DataFrame(rows, columns=OUTPUT_COLUMNS)
+
+
+def write_species_list_descriptions(file_path: str, level: str, output_path: str, resume: bool = False) -> None:
+    """
+    Procesa una lista de taxones y escribe cada fila en un CSV en cuanto se obtiene.
+
+    Las filas no se acumulan en memoria y el archivo se vacía tras cada taxón, por lo que
+    una ejecución interrumpida conserva lo ya descargado. Con `resume=True`, los taxones
+    que ya aparecen en `output_path` se omiten y las filas nuevas se añaden al final; si no,
+    el archivo se sobrescribe.
+
+    Args:
+        file_path (str): Ruta al archivo de texto con nombres (uno por línea).
+        level (TaxonomicLevel): 'species' o 'family'.
+        output_path (str): Ruta del CSV de salida, con columnas OUTPUT_COLUMNS.
+        resume (bool): Continuar una ejecución interrumpida en lugar de empezar de cero.
+    """
+    done = set()
+    if resume and os.path.exists(output_path):
+        with open(output_path, newline="", encoding="utf-8") as f:
+            done = {row["taxon"] for row in csv.DictReader(f)}
+    taxon_names = [name for name in read_taxon_names(file_path) if name not in done]
+    if done:
+        logger.info("Skipping %d taxa already in %s", len(done), output_path)
+
+    with open(output_path, "a" if resume else "w", newline="", encoding="utf-8") as f:
+        # pandas (and the tracked CSVs) use LF line endings
+        writer = csv.DictWriter(f, fieldnames=OUTPUT_COLUMNS, lineterminator="\n")
+        if f.tell() == 0:
+            writer.writeheader()
+        current_taxon = None
+        for row in iter_description_rows(taxon_names, level):
+            if row["taxon"] != current_taxon:
+                # Every row of the previous taxon has been written
+                f.flush()
+                current_taxon = row["taxon"]
+            writer.writerow(row)
+
 
 if __name__ == "__main__":
+    setup_logging(logging.INFO)
     level = 'genus'
-    df = process_species_list_with_routing("genus_list_CR.txt", level)
-    df.to_csv("genus_descriptions_costarica.csv", index=False)
-    print("\nSaved to 'genus_descriptions.csv'")
+    # Pass --resume to continue an interrupted run instead of regenerating the file
+    resume = "--resume" in sys.argv[1:]
+    write_species_list_descriptions("genus_list_CR.txt", level, "genus_descriptions_costarica.csv", resume=resume)
+    print("\nSaved to 'genus_descriptions_costarica.csv'")